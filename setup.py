@@ -10,7 +10,8 @@ setup(
         "numpy",
         "sounddevice",
         "scipy",
-        "pynput"
+        "pynput",
+        "numba"
     ],
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -8,7 +8,9 @@ Author: Valerio Poggi - 2025
 """
 
 from synth8.terminal import TerminalSilent
+from synth8 import _kernels
 
+import math
 import time
 import threading
 import numpy as np
@@ -19,6 +21,38 @@ from pynput import keyboard
 SAMPLE_RATE = 44100
 BLOCK_SIZE = 512
 LATENCY = 0.01
+EVENT_QUEUE_SIZE = 256
+# Batch size at which the prange voice kernel beats the sequential
+# accumulate kernel despite its extra row buffer and reduction pass
+PARALLEL_VOICE_MIN = 8
+
+# Precomputed 1/sqrt(n) mix-normalization factors, indexed by active
+# voice count; one table load replaces a per-block sqrt and division
+_INV_SQRT = np.array(
+    [0.0] + [1.0 / math.sqrt(n) for n in range(1, 65)],
+    dtype=np.float32
+)
+
+# Structure-of-arrays layout for batched fused-voice rendering; the
+# field order matches the render_all_kernel argument order
+_SOA_SPEC = (
+    ('base_freq', np.float64),
+    ('units_per_hz', np.float64),
+    ('osc_phase', np.int64),
+    ('wave', np.int64),
+    ('use_lfo', np.uint8),
+    ('lfo_phase', np.int64),
+    ('lfo_inc', np.int64),
+    ('lfo_depth', np.float64),
+    ('lfo_wave', np.int64),
+    ('env_level', np.float64),
+    ('env_phase', np.int64),
+    ('a_rate', np.float64),
+    ('d_rate', np.float64),
+    ('sustain', np.float64),
+    ('r_rate', np.float64),
+    ('gain', np.float64),
+)
 
 
 class SynthEngine:
@@ -34,7 +68,23 @@ class SynthEngine:
         self.voices = {}
         self.modulators = []
         self.keymap = {}
+        # Immutable snapshot of the voice table, swapped atomically by
+        # the control thread and read without locking by the audio
+        # thread; _active_ids is touched by the audio thread only
+        self._voice_snapshot = {}
+        self._active_ids = set()
         self._pressed_keys = set()
+        self._mix_buf = np.zeros(BLOCK_SIZE, dtype=np.float32)
+        self._row_sum = np.zeros(BLOCK_SIZE, dtype=np.float32)
+        self._rows = None
+        self._soa = None
+        # Ring buffer of (voice id, gate on) note events; producers
+        # (listener and control threads) serialize on self._lock, the
+        # audio thread consumes without locking
+        self._events = [None] * EVENT_QUEUE_SIZE
+        self._event_head = 0
+        self._event_tail = 0
+        self._block_count = 0
         self._lock = threading.Lock()
         self.stream = None
         self.listener = None
@@ -52,6 +102,7 @@ class SynthEngine:
             self.voices[id] = voice
             if key:
                 self.keymap[key.lower()] = id
+            self._voice_snapshot = dict(self.voices)
 
     def remove_voice(self, id):
         """
@@ -66,46 +117,102 @@ class SynthEngine:
                     del self.keymap[key]
             if id in self.voices:
                 del self.voices[id]
+            self._voice_snapshot = dict(self.voices)
 
     def voice_on(self, id):
         """
-        Triggers a voice to begin its attack phase.
+        Queues a voice to begin its attack phase at the next block.
 
         Parameters:
             id (str): Voice identifier.
         """
-        with self._lock:
-            if id in self.voices:
-                self.voices[id].trigger_on()
+        self._push_event(id, True)
 
     def voice_off(self, id):
         """
-        Triggers the release phase of a voice.
+        Queues the release phase of a voice at the next block.
 
         Parameters:
             id (str): Voice identifier.
         """
+        self._push_event(id, False)
+
+    def _push_event(self, id, on):
+        """
+        Queues a note event from a control thread.
+
+        Producers serialize on the control lock; the audio thread
+        never takes it. Events are dropped when the ring buffer is
+        full rather than blocking the producer.
+
+        Parameters:
+            id (str): Voice identifier.
+            on (bool): True for gate on, False for gate off.
+        """
         with self._lock:
-            if id in self.voices:
-                self.voices[id].trigger_off()
+            tail = self._event_tail
+            next_tail = (tail + 1) % EVENT_QUEUE_SIZE
+            if next_tail == self._event_head:
+                return
+            self._events[tail] = (id, on)
+            self._event_tail = next_tail
+
+    def _drain_events(self, voices):
+        """
+        Applies queued note events on the audio thread.
+
+        Parameters:
+            voices (dict): Voice snapshot for the current block.
+        """
+        head = self._event_head
+        while head != self._event_tail:
+            id, on = self._events[head]
+            head = (head + 1) % EVENT_QUEUE_SIZE
+            voice = voices.get(id)
+            if voice is not None:
+                if on:
+                    voice.trigger_on()
+                    self._active_ids.add(id)
+                else:
+                    voice.trigger_off()
+        self._event_head = head
 
     def _on_press(self, key):
-        try:
-            char = key.char.lower()
-            if char in self.keymap and char not in self._pressed_keys:
-                self._pressed_keys.add(char)
-                self.voice_on(self.keymap[char])
-        except AttributeError:
-            pass
+        char = getattr(key, 'char', None)
+        if char is None:
+            return
+        char = char.lower()
+        if char in self.keymap and char not in self._pressed_keys:
+            self._pressed_keys.add(char)
+            self._push_event(self.keymap[char], True)
 
     def _on_release(self, key):
-        try:
-            char = key.char.lower()
-            if char in self._pressed_keys:
-                self._pressed_keys.remove(char)
-                self.voice_off(self.keymap[char])
-        except AttributeError:
-            pass
+        char = getattr(key, 'char', None)
+        if char is None:
+            return
+        char = char.lower()
+        if char in self._pressed_keys:
+            self._pressed_keys.remove(char)
+            self._push_event(self.keymap[char], False)
+
+    def _soa_arrays(self, n):
+        """
+        Returns the structure-of-arrays state buffers, grown to hold
+        at least n voices.
+
+        Parameters:
+            n (int): Number of batched voices.
+
+        Returns:
+            dict: Field name to preallocated state array.
+        """
+        if self._soa is None or self._soa['base_freq'].shape[0] < n:
+            cap = max(n, 16)
+            self._soa = {
+                name: np.zeros(cap, dtype=dtype)
+                for name, dtype in _SOA_SPEC
+            }
+        return self._soa
 
     def _callback(self, outdata, frames, time_info, status):
         """
@@ -117,22 +224,97 @@ class SynthEngine:
             time_info (dict): Timing metadata.
             status (CallbackFlags): Stream status flags.
         """
-        mix = np.zeros(frames, dtype=np.float32)
+        if frames > self._mix_buf.shape[0]:
+            self._mix_buf = np.zeros(frames, dtype=np.float32)
+            self._row_sum = np.zeros(frames, dtype=np.float32)
+        mix = self._mix_buf[:frames]
+        mix.fill(0.0)
 
-        with self._lock:
-            active = 0
-            for voice in self.voices.values():
-                if voice.active:
-                    signal = voice.render(frames)
-                    if signal is not None:
-                        mix += signal
-                        active += 1
-
-            if active > 0:
-                mix *= 1.0 / np.sqrt(active)
-
-        # Output stereo (dual-mono)
-        outdata[:] = np.column_stack((mix, mix))
+        # Lock-free hot path: read an immutable voice snapshot swapped
+        # atomically by the control thread; the event ring and the
+        # active-id set are consumed/owned by this thread only
+        voices = self._voice_snapshot
+        self._drain_events(voices)
+        self._block_count += 1
+
+        active = 0
+        finished = None
+        batch = None
+        for id in self._active_ids:
+            voice = voices.get(id)
+            if voice is None:
+                # Removed by the control thread; retire the slot
+                if finished is None:
+                    finished = []
+                finished.append(id)
+                continue
+            ensure = getattr(voice, "_ensure_plan", None)
+            if ensure is not None and ensure() is not False:
+                if batch is None:
+                    batch = []
+                batch.append((id, voice))
+                continue
+            signal = voice.render(frames, self._block_count)
+            if signal is not None:
+                mix += signal
+                active += 1
+            if not voice.active:
+                if finished is None:
+                    finished = []
+                finished.append(id)
+
+        if batch is not None:
+            soa = self._soa_arrays(len(batch))
+            for idx, (id, voice) in enumerate(batch):
+                voice._gather_fused(soa, idx)
+
+            if len(batch) >= PARALLEL_VOICE_MIN:
+                # Big chords render one voice per core into separate
+                # rows, then reduce; small batches stay sequential
+                # where accumulate-into-mix is cheaper
+                if (self._rows is None
+                        or self._rows.shape[0] < len(batch)
+                        or self._rows.shape[1] < frames):
+                    self._rows = np.zeros(
+                        (max(len(batch), 16), max(frames, BLOCK_SIZE)),
+                        dtype=np.float32
+                    )
+                rows = self._rows[:len(batch), :frames]
+                _kernels.render_all_parallel_kernel(
+                    rows, len(batch),
+                    *(soa[name] for name, dtype in _SOA_SPEC)
+                )
+                np.sum(rows, axis=0, out=self._row_sum[:frames])
+                mix += self._row_sum[:frames]
+            else:
+                _kernels.render_all_kernel(
+                    mix, len(batch),
+                    *(soa[name] for name, dtype in _SOA_SPEC)
+                )
+
+            for idx, (id, voice) in enumerate(batch):
+                voice._scatter_fused(soa, idx)
+                if not voice.active:
+                    if finished is None:
+                        finished = []
+                    finished.append(id)
+            active += len(batch)
+
+        if finished is not None:
+            self._active_ids.difference_update(finished)
+
+        # Output stereo (dual-mono): normalize straight into the left
+        # channel, then duplicate, so scaling costs no extra pass
+        # over the mix buffer
+        if active > 0:
+            if active < _INV_SQRT.shape[0]:
+                scale = _INV_SQRT[active]
+            else:
+                scale = np.float32(1.0 / math.sqrt(active))
+            np.multiply(mix, scale, out=outdata[:, 0])
+        else:
+            outdata[:, 0] = mix
+        outdata[:, 1] = outdata[:, 0]
 
     def _start_keyboard_listener(self):
         """
@@ -8,15 +8,44 @@ Author: Valerio Poggi - 2025
 """
 
 from synth8.engine import SAMPLE_RATE
+from synth8 import _kernels
+from synth8.nodes import (_sine_block, _square_block, _saw_block,
+                          _triangle_block)
 
+import math
 import numpy as np
 
 
+# Mapping between the public string envelope phases and the integer
+# identifiers consumed by the compiled ADSR kernel
+_ENV_IDS = {
+    'off': _kernels.ENV_OFF,
+    'attack': _kernels.ENV_ATTACK,
+    'decay': _kernels.ENV_DECAY,
+    'sustain': _kernels.ENV_SUSTAIN,
+    'release': _kernels.ENV_RELEASE,
+}
+_ENV_NAMES = {v: k for k, v in _ENV_IDS.items()}
+
+
+# Waveform dispatch table bound per LFO at configuration time
+_LFO_FNS = {
+    'sine': _sine_block,
+    'square': _square_block,
+    'saw': _saw_block,
+    'triangle': _triangle_block,
+}
+
+
 class SynthModulator:
     """
     Base class for modulation sources.
     """
 
+    # Whether the modulator currently keeps its voice alive; gated
+    # subclasses (envelopes) shadow this with instance state
+    active = False
+
     def __init__(self):
         self.targets = []
 
@@ -42,12 +71,14 @@ class SynthModulator:
         """
         pass
 
-    def render(self, frames):
+    def render(self, frames, block_id=None):
         """
         Computes the modulation signal and routes it to all targets.
 
         Parameters:
             frames (int): Number of samples to generate.
+            block_id (int, optional): Monotonic audio-block counter;
+                lets shared modulators render once per block.
         """
         raise NotImplementedError("Subclasses must implement render().")
 
@@ -61,87 +92,112 @@ class SynthADSR(SynthModulator):
                  sustain=0.7, release=0.3,
                  sample_rate=SAMPLE_RATE):
         super().__init__()
-        self.attack = float(attack)
-        self.decay = float(decay)
-        self.sustain = float(sustain)
-        self.release = float(release)
         self.sample_rate = sample_rate
+        self._attack = float(attack)
+        self._decay = float(decay)
+        self._sustain = float(sustain)
+        self._release = float(release)
 
-        self.env_phase = 'off'
+        self._phase_id = _kernels.ENV_OFF
         self.env_level = 0.0
         self.active = False
+        self._out_buf = np.zeros(0, dtype=np.float32)
+        self._update_rates()
+
+    def _update_rates(self):
+        """
+        Precomputes per-sample envelope increments so the audio
+        callback never divides by segment durations.
+        """
+        sr = self.sample_rate
+        self._a_rate = 1.0 / max(self._attack * sr, 1.0)
+        self._d_rate = (1.0 - self._sustain) / max(self._decay * sr, 1.0)
+        # Provisional release rate; trigger_off() recomputes it from
+        # the level actually held when the gate opens
+        self._r_rate = max(self._sustain, 1e-3) / max(self._release * sr, 1.0)
+
+    @property
+    def attack(self):
+        return self._attack
+
+    @attack.setter
+    def attack(self, value):
+        self._attack = float(value)
+        self._update_rates()
+
+    @property
+    def decay(self):
+        return self._decay
+
+    @decay.setter
+    def decay(self, value):
+        self._decay = float(value)
+        self._update_rates()
+
+    @property
+    def sustain(self):
+        return self._sustain
+
+    @sustain.setter
+    def sustain(self, value):
+        self._sustain = float(value)
+        self._update_rates()
+
+    @property
+    def release(self):
+        return self._release
+
+    @release.setter
+    def release(self, value):
+        self._release = float(value)
+        self._update_rates()
+
+    @property
+    def env_phase(self):
+        """
+        Envelope phase as its public string name; the phase is stored
+        internally as an integer identifier for the kernels.
+        """
+        return _ENV_NAMES[self._phase_id]
+
+    @env_phase.setter
+    def env_phase(self, value):
+        self._phase_id = _ENV_IDS.get(value, value)
 
     def trigger_on(self):
-        self.env_phase = 'attack'
+        self._phase_id = _kernels.ENV_ATTACK
         self.env_level = 0.0
         self.active = True
 
     def trigger_off(self):
-        if self.env_phase != 'off':
-            self.env_phase = 'release'
-
-    def render(self, frames):
-        out = np.zeros(frames, dtype=np.float32)
-        sr = self.sample_rate
-
-        t = np.arange(frames) / sr
-        level = self.env_level
-
-        i = 0
-        while i < frames:
-            remaining = frames - i
-            if self.env_phase == 'attack':
-                dur = max(int(self.attack * sr), 1)
-                step = 1.0 / dur
-                n = min(dur, remaining)
-                env = level + step * np.arange(n)
-                env = np.clip(env, 0.0, 1.0)
-                out[i:i+n] = env
-                level = env[-1]
-                i += n
-                if level >= 1.0:
-                    level = 1.0
-                    self.env_phase = 'decay'
-
-            elif self.env_phase == 'decay':
-                dur = max(int(self.decay * sr), 1)
-                step = (1.0 - self.sustain) / dur
-                n = min(dur, remaining)
-                env = level - step * np.arange(n)
-                env = np.clip(env, self.sustain, 1.0)
-                out[i:i+n] = env
-                level = env[-1]
-                i += n
-                if level <= self.sustain:
-                    level = self.sustain
-                    self.env_phase = 'sustain'
-
-            elif self.env_phase == 'sustain':
-                out[i:] = self.sustain
-                level = self.sustain
-                i = frames
-                break
-
-            elif self.env_phase == 'release':
-                dur = max(int(self.release * sr), 1)
-                step = level / dur
-                n = min(dur, remaining)
-                env = level - step * np.arange(n)
-                env = np.clip(env, 0.0, 1.0)
-                out[i:i+n] = env
-                level = env[-1]
-                i += n
-                if level <= 0.001:
-                    level = 0.0
-                    self.env_phase = 'off'
-                    self.active = False
-
-            else:  # 'off'
-                out[i:] = 0.0
-                i = frames
-                break
-
+        if self._phase_id != _kernels.ENV_OFF:
+            # Release from the level actually held, so zero-sustain
+            # patches still decay and the segment lasts ~release
+            # seconds no matter where in the envelope the gate opens
+            self._r_rate = (
+                max(self.env_level, 1e-3)
+                / max(self._release * self.sample_rate, 1.0)
+            )
+            self._phase_id = _kernels.ENV_RELEASE
+
+    def render(self, frames, block_id=None):
+        if frames > self._out_buf.shape[0]:
+            self._out_buf = np.zeros(frames, dtype=np.float32)
+        out = self._out_buf[:frames]
+
+        phase, level = _kernels.adsr_kernel(
+            out,
+            self.env_level,
+            self._phase_id,
+            self._a_rate,
+            self._d_rate,
+            self.sustain,
+            self._r_rate
+        )
+
+        self._phase_id = phase
         self.env_level = level
+        self.active = phase != _kernels.ENV_OFF
 
         for target, param in self.targets:
             target.accept_modulation(param, out)
@@ -157,31 +213,101 @@ class SynthLFO(SynthModulator):
     def __init__(self, freq=5.0, depth=1.0, waveform='sine',
                  sample_rate=SAMPLE_RATE):
         super().__init__()
+        self.sample_rate = sample_rate
         self.freq = float(freq)
         self.depth = float(depth)
         self.waveform = waveform
-        self.sample_rate = sample_rate
-        self.phase = 0.0
-
-    def render(self, frames):
-        t = np.arange(frames)
-        phase_inc = 2 * np.pi * self.freq / self.sample_rate
-        phase_array = self.phase + t * phase_inc
-
-        self.phase = (self.phase + frames * phase_inc) % (2 * np.pi)
-
-        if self.waveform == 'sine':
-            mod = np.sin(phase_array)
-        elif self.waveform == 'square':
-            mod = np.sign(np.sin(phase_array))
-        elif self.waveform == 'saw':
-            mod = 2 * ((phase_array / (2 * np.pi)) % 1) - 1
-        elif self.waveform == 'triangle':
-            mod = 2 * np.abs(2 * ((phase_array / (2 * np.pi)) % 1) - 1) - 1
+        # Canonical phase state: 32-bit integer units, 2^32 = one
+        # period, so wrapping never loses precision
+        self._phase_units = 0
+        self._last_block = None
+        self._last_out = None
+        self._out_buf = np.zeros(0, dtype=np.float32)
+
+    @property
+    def freq(self):
+        return self._freq
+
+    @freq.setter
+    def freq(self, value):
+        self._freq = float(value)
+        # Per-sample increments in radians and in integer phase
+        # units, computed once here instead of every block
+        self._phase_inc = _kernels.TWO_PI * self._freq / self.sample_rate
+        self._units_inc = int(
+            self._freq * _kernels.PHASE_SCALE / self.sample_rate
+        ) & _kernels.PHASE_MASK
+
+    @property
+    def phase(self):
+        """
+        LFO phase in radians, stored internally as 32-bit integer
+        phase units.
+        """
+        return _kernels.units_to_radians(self._phase_units)
+
+    @phase.setter
+    def phase(self, value):
+        self._phase_units = _kernels.radians_to_units(value)
+
+    @property
+    def waveform(self):
+        return self._waveform
+
+    @waveform.setter
+    def waveform(self, value):
+        self._waveform = value
+        self._wave_fn = _LFO_FNS.get(value)
+        # Integer kernel identifier, resolved once at assignment so
+        # the per-block paths never compare strings
+        self._wave_id = _kernels.WAVE_IDS.get(value)
+
+    def render(self, frames, block_id=None):
+        # An LFO shared by several voices is rendered once per audio
+        # block; later calls in the same block re-route the cached
+        # buffer without advancing the phase again
+        if (block_id is not None and block_id == self._last_block
+                and self._last_out is not None
+                and self._last_out.shape[0] == frames):
+            out = self._last_out
+            for target, param in self.targets:
+                target.accept_modulation(param, out)
+            return out
+
+        if _kernels.HAVE_NUMBA and self._wave_id is not None:
+            if frames > self._out_buf.shape[0]:
+                self._out_buf = np.zeros(frames, dtype=np.float32)
+            out = self._out_buf[:frames]
+            self._phase_units = _kernels.lfo_kernel(
+                out, self._phase_units, self._units_inc,
+                self._wave_id, self.depth
+            )
         else:
-            mod = np.zeros(frames)
-
-        out = self.depth * mod.astype(np.float32)
+            # Build the phase block in float32 straight into the
+            # reused output buffer and evaluate the waveform in place,
+            # keeping only the scalar accumulator in float64
+            if frames > self._out_buf.shape[0]:
+                self._out_buf = np.zeros(frames, dtype=np.float32)
+            out = self._out_buf[:frames]
+
+            phase_inc = self._phase_inc
+            np.multiply(
+                _kernels.block_ramp32(frames), np.float32(phase_inc),
+                out=out
+            )
+            out += np.float32(self.phase)
+            self.phase = math.fmod(
+                self.phase + frames * phase_inc, _kernels.TWO_PI
+            )
+
+            if self._wave_fn is not None:
+                self._wave_fn(out)
+            else:
+                out.fill(0.0)
+            out *= np.float32(self.depth)
+
+        self._last_block = block_id
+        self._last_out = out
 
         for target, param in self.targets:
             target.accept_modulation(param, out)
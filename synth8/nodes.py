@@ -10,14 +10,137 @@ Author: Valerio Poggi - 2025
 
 from synth8.engine import SAMPLE_RATE
 from synth8.param import ParamRef
+from synth8 import _kernels
 
+import functools
+import math
 import numpy as np
-from scipy.signal import butter, sosfilt, sosfilt_zi
+from scipy.signal import butter, sosfilt
+
+
+_TWO_PI_F32 = np.float32(2.0 * np.pi)
+_INV_TWO_PI_F32 = np.float32(1.0 / (2.0 * np.pi))
+
+
+def _as_float32c(signal):
+    """
+    Returns the signal unchanged when it is already a C-contiguous
+    float32 array, otherwise a contiguous float32 copy. Guards the
+    kernel and sosfilt inputs against strided or wider-typed blocks
+    from custom upstream modules, which would otherwise trigger a
+    hidden per-block copy (or a signature mismatch) downstream.
+    """
+    if signal.dtype == np.float32 and signal.flags.c_contiguous:
+        return signal
+    return np.ascontiguousarray(signal, dtype=np.float32)
+
+
+def _sine_block(phase):
+    """
+    Sine waveform over a float32 phase block.
+
+    The phase array is a per-block scratch buffer owned by the caller
+    and is consumed in place, so no temporaries are allocated.
+    """
+    np.sin(phase, out=phase)
+    return phase
+
+
+def _square_block(phase):
+    """
+    Square waveform as a branchless comparator on the phase itself:
+    +1 in the first half-period, -1 in the second, with no
+    transcendental call.
+
+    The phase array is a per-block scratch buffer owned by the caller
+    and is consumed in place, so no temporaries are allocated.
+    """
+    np.multiply(phase, _INV_TWO_PI_F32, out=phase)
+    np.mod(phase, 1, out=phase)
+    # floor(p + 0.5) is 0 in the first half-period and 1 in the
+    # second, mapped to +1/-1 without a boolean temporary
+    np.add(phase, 0.5, out=phase)
+    np.floor(phase, out=phase)
+    np.multiply(phase, -2, out=phase)
+    np.add(phase, 1, out=phase)
+    return phase
+
+
+def _saw_block(phase):
+    """
+    Sawtooth waveform over a float32 phase block.
+
+    The phase array is a per-block scratch buffer owned by the caller
+    and is consumed in place, so no temporaries are allocated.
+    """
+    np.multiply(phase, _INV_TWO_PI_F32, out=phase)
+    np.mod(phase, 1, out=phase)
+    np.multiply(phase, 2, out=phase)
+    np.subtract(phase, 1, out=phase)
+    return phase
+
+
+def _triangle_block(phase):
+    """
+    Triangle waveform over a float32 phase block.
+
+    The phase array is a per-block scratch buffer owned by the caller
+    and is consumed in place, so no temporaries are allocated.
+    """
+    np.multiply(phase, _INV_TWO_PI_F32, out=phase)
+    np.mod(phase, 1, out=phase)
+    np.multiply(phase, 2, out=phase)
+    np.subtract(phase, 1, out=phase)
+    np.abs(phase, out=phase)
+    np.multiply(phase, 2, out=phase)
+    np.subtract(phase, 1, out=phase)
+    return phase
+
+
+# Modulated cutoffs are quantized to this step (Hz) before hitting
+# the design cache, so a sweep reuses designs instead of running
+# SciPy's filter design for every block
+_CUTOFF_QUANT = 5.0
+
+# Cutoff modulation is followed at this many coefficient updates per
+# block: sweeps stay audible without per-sample redesign
+_CUTOFF_SUBBLOCKS = 4
+
+
+@functools.lru_cache(maxsize=512)
+def _butter_lp_coeffs(cutoff, sample_rate):
+    """
+    Designs and caches normalized lowpass biquad coefficients.
+
+    The design is a pure function of (cutoff, sample_rate), so the
+    cache is shared across all filter instances and each unique
+    cutoff pays the SciPy design cost once per process.
+
+    Parameters:
+        cutoff (float): Cutoff frequency in Hz.
+        sample_rate (float): Sampling rate in Hz.
+
+    Returns:
+        tuple: (b0, b1, b2, a1, a2) scalar coefficients.
+    """
+    wn = cutoff / (0.5 * sample_rate)
+    sos = butter(N=2, Wn=wn, btype="low", output="sos")
+    return (sos[0, 0], sos[0, 1], sos[0, 2], sos[0, 4], sos[0, 5])
+
+
+# Waveform dispatch table bound per oscillator at configuration time,
+# so process() never branches on the waveform string
+_WAVE_FNS = {
+    "sine": _sine_block,
+    "square": _square_block,
+    "saw": _saw_block,
+    "triangle": _triangle_block,
+}
 
 
 class SynthOscillator:
     """
-    Basic waveform oscillator: sine, square, sawtooth.
+    Basic waveform oscillator: sine, square, sawtooth, triangle.
     """
 
     def __init__(self, freq=440.0, waveform="sine", sample_rate=SAMPLE_RATE):
@@ -26,13 +149,61 @@ class SynthOscillator:
 
         Parameters:
             freq (float): Base frequency in Hz.
-            waveform (str): Waveform type: 'sine', 'square', 'saw'.
+            waveform (str): Waveform type: 'sine', 'square', 'saw',
+                'triangle'.
         """
+        self.sample_rate = sample_rate
+        self._units_per_hz = _kernels.PHASE_SCALE / sample_rate
+        # Radians per sample per Hz, divided once here rather than
+        # per block (float32 copy for the in-place fallback chain)
+        self._two_pi_over_sr = _kernels.TWO_PI / sample_rate
+        self._two_pi_over_sr_f32 = np.float32(self._two_pi_over_sr)
         self.base_freq = freq
         self.waveform = waveform
-        self.sample_rate = sample_rate
-        self.phase = 0.0
+        # Canonical phase state: 32-bit integer units, 2^32 = one
+        # period, so wrapping never loses precision
+        self._phase_units = 0
         self._freq_mod = None
+        self._phase_buf = np.zeros(0, dtype=np.float32)
+
+    @property
+    def base_freq(self):
+        return self._base_freq
+
+    @base_freq.setter
+    def base_freq(self, value):
+        self._base_freq = value
+        # Per-sample phase increment for the constant-frequency path,
+        # clipped and divided once here instead of every block
+        f = min(max(float(value), 20.0), 20000.0)
+        self._phase_inc = f * self._two_pi_over_sr
+        self._units_inc = int(
+            f * _kernels.PHASE_SCALE / self.sample_rate
+        ) & _kernels.PHASE_MASK
+
+    @property
+    def phase(self):
+        """
+        Oscillator phase in radians, stored internally as 32-bit
+        integer phase units.
+        """
+        return _kernels.units_to_radians(self._phase_units)
+
+    @phase.setter
+    def phase(self, value):
+        self._phase_units = _kernels.radians_to_units(value)
+
+    @property
+    def waveform(self):
+        return self._waveform
+
+    @waveform.setter
+    def waveform(self, value):
+        self._waveform = value
+        self._wave_fn = _WAVE_FNS.get(value)
+        # Integer kernel identifier, resolved once at assignment so
+        # the per-block paths never compare strings
+        self._wave_id = _kernels.WAVE_IDS.get(value)
 
     def param(self, name):
         return ParamRef(self, name)
@@ -50,39 +221,68 @@ class SynthOscillator:
             frames (int): Number of samples to generate.
 
         Returns:
-            np.ndarray: Generated waveform block.
+            np.ndarray: Generated waveform block. The returned array
+            is a reusable scratch buffer owned by the oscillator;
+            callers must consume it before the next process call.
         """
-        t = np.arange(frames)
+        # Compiled path: integer phase accumulation plus a lookup-table
+        # read per sample, matching the fused voice kernel
+        if _kernels.HAVE_NUMBA and self._wave_id is not None:
+            if frames > self._phase_buf.shape[0]:
+                self._phase_buf = np.zeros(frames, dtype=np.float32)
+            out = self._phase_buf[:frames]
+            if self._freq_mod is not None:
+                self._phase_units = _kernels.osc_mod_kernel(
+                    out, self._freq_mod[:frames], self._phase_units,
+                    self.base_freq, self._units_per_hz, self._wave_id
+                )
+            else:
+                self._phase_units = _kernels.osc_kernel(
+                    out, self._phase_units, self._units_inc,
+                    self._wave_id
+                )
+            return out
 
-        # Combine base frequency with modulation, if any
         if self._freq_mod is not None:
-            freq = self.base_freq + self._freq_mod[:frames]
-        else:
-            freq = self.base_freq
-
-        # Ensure freq is a valid array and clip to safe bounds
-        if isinstance(freq, np.ndarray):
-            freq = np.clip(freq, 20.0, 20000.0)
-            phase_inc = 2 * np.pi * freq / self.sample_rate
-        else:
-            freq = np.clip(freq, 20.0, 20000.0)
-            phase_inc = 2 * np.pi * freq / self.sample_rate
-            phase_inc = np.full(frames, phase_inc)
-
-        # Advance phase and generate waveform
-        phase_array = self.phase + np.cumsum(phase_inc)
-        self.phase = phase_array[-1] % (2 * np.pi)
-
-        if self.waveform == "sine":
-            signal = np.sin(phase_array)
-        elif self.waveform == "square":
-            signal = np.sign(np.sin(phase_array))
-        elif self.waveform == "saw":
-            signal = 2 * ((phase_array / (2 * np.pi)) % 1) - 1
+            # Modulated frequency: run the whole add/clip/increment/
+            # cumsum chain in place over the float32 phase scratch,
+            # so the branch writes one buffer instead of four
+            if frames > self._phase_buf.shape[0]:
+                self._phase_buf = np.zeros(frames, dtype=np.float32)
+            phase32 = self._phase_buf[:frames]
+            np.add(
+                self._freq_mod[:frames], np.float32(self.base_freq),
+                out=phase32
+            )
+            np.clip(phase32, 20.0, 20000.0, out=phase32)
+            np.multiply(phase32, self._two_pi_over_sr_f32, out=phase32)
+            np.cumsum(phase32, out=phase32)
+            phase32 += np.float32(self.phase)
+            self.phase = math.fmod(float(phase32[-1]), _kernels.TWO_PI)
         else:
-            signal = np.zeros(frames, dtype=np.float32)
-
-        return signal.astype(np.float32)
+            # Constant frequency: build the phase block in float32
+            # straight into a reused scratch buffer, keeping only the
+            # scalar accumulator in float64; the clipped increment is
+            # precomputed by the base_freq setter
+            phase_inc = self._phase_inc
+            if frames > self._phase_buf.shape[0]:
+                self._phase_buf = np.zeros(frames, dtype=np.float32)
+            phase32 = self._phase_buf[:frames]
+            np.multiply(
+                _kernels.block_ramp32(frames), np.float32(phase_inc),
+                out=phase32
+            )
+            phase32 += np.float32(self.phase + phase_inc)
+            self.phase = math.fmod(
+                self.phase + frames * phase_inc, _kernels.TWO_PI
+            )
+
+        if self._wave_fn is None:
+            # Unknown waveform: reuse the phase scratch as a silent
+            # block instead of allocating zeros
+            phase32.fill(0.0)
+            return phase32
+        return self._wave_fn(phase32)
 
 
 
@@ -96,14 +296,28 @@ class SynthFilter:
         Initializes the filter.
 
         Parameters:
-            cutoff (float): Cutoff frequency in Hz.
+            cutoff (float or None): Cutoff frequency in Hz; None
+                bypasses the filter entirely.
         """
-        self.base_cutoff = cutoff
         self.sample_rate = SAMPLE_RATE
         self._cutoff_mod = None
+        self.base_cutoff = cutoff
+        self._coeffs = None
         self._sos = None
         self._zi = None
         self._last_cutoff = None
+        self._out_buf = np.zeros(0, dtype=np.float32)
+
+    @property
+    def base_cutoff(self):
+        return self._base_cutoff
+
+    @base_cutoff.setter
+    def base_cutoff(self, value):
+        self._base_cutoff = value
+        # Bypass is resolved here, at configuration time, so process()
+        # never re-evaluates it per block
+        self._bypass = value is None and self._cutoff_mod is None
 
     def param(self, name):
         return ParamRef(self, name)
@@ -111,12 +325,16 @@ class SynthFilter:
     def accept_modulation(self, param, buffer):
         if param == "cutoff":
             self._cutoff_mod = buffer
+            self._bypass = False
 
     def _design_filter(self, cutoff):
-        wn = cutoff / (0.5 * self.sample_rate)
-        sos = butter(N=2, Wn=wn, btype="low", output="sos")
-        zi = sosfilt_zi(sos)
-        return sos, zi
+        """
+        Computes normalized biquad coefficients for a given cutoff.
+
+        Returns:
+            tuple: (b0, b1, b2, a1, a2) scalar coefficients.
+        """
+        return _butter_lp_coeffs(float(cutoff), float(self.sample_rate))
 
     def process(self, input, frames):
         """
@@ -130,20 +348,82 @@ class SynthFilter:
             np.ndarray: Filtered signal.
         """
         if input is None:
-            return np.zeros(frames, dtype=np.float32)
+            if frames > self._out_buf.shape[0]:
+                self._out_buf = np.zeros(frames, dtype=np.float32)
+            out = self._out_buf[:frames]
+            out.fill(0.0)
+            return out
+
+        if self._bypass:
+            return input
+
+        input = _as_float32c(input)
+
+        if self._cutoff_mod is not None and _kernels.HAVE_NUMBA:
+            # Time-varying cutoff: re-read the (quantized, cached)
+            # design at each sub-block boundary while the biquad
+            # state runs through unbroken
+            if self._zi is None:
+                self._zi = np.zeros(2, dtype=np.float64)
+            if frames > self._out_buf.shape[0]:
+                self._out_buf = np.zeros(frames, dtype=np.float32)
+            out = self._out_buf[:frames]
+            step = max(frames // _CUTOFF_SUBBLOCKS, 1)
+            start = 0
+            while start < frames:
+                end = min(start + step, frames)
+                cutoff = min(max(float(self._cutoff_mod[start]),
+                                 50.0), 20000.0)
+                cutoff = round(cutoff / _CUTOFF_QUANT) * _CUTOFF_QUANT
+                b0, b1, b2, a1, a2 = self._design_filter(cutoff)
+                _kernels.biquad_kernel(
+                    out[start:end], input[start:end],
+                    b0, b1, b2, a1, a2, self._zi
+                )
+                start = end
+            return out
 
         if self._cutoff_mod is not None:
-            # Use first value to design static filter
+            # Without the compiled kernel, design one static filter
+            # per block from the first (quantized) modulation value
             cutoff = float(np.clip(self._cutoff_mod[0], 50, 20000))
+            cutoff = round(cutoff / _CUTOFF_QUANT) * _CUTOFF_QUANT
         else:
             cutoff = self.base_cutoff
 
-        if self._sos is None or cutoff != self._last_cutoff:
-            self._sos, self._zi = self._design_filter(cutoff)
+        if self._coeffs is None or cutoff != self._last_cutoff:
+            self._coeffs = self._design_filter(cutoff)
             self._last_cutoff = cutoff
-
-        output, self._zi = sosfilt(self._sos, input, zi=self._zi)
-        return output.astype(np.float32)
+            self._sos = None
+
+        if self._zi is None:
+            # The compiled biquad carries float64 state; the SciPy
+            # fallback keeps everything float32 so sosfilt stays on
+            # its single-precision kernel without upcasting
+            dtype = np.float64 if _kernels.HAVE_NUMBA else np.float32
+            self._zi = np.zeros(2, dtype=dtype)
+
+        b0, b1, b2, a1, a2 = self._coeffs
+
+        if not _kernels.HAVE_NUMBA:
+            # SciPy keeps the filtering vectorized when the biquad
+            # kernel would run interpreted; the float32 section array
+            # is rebuilt only when the coefficients change
+            if self._sos is None:
+                self._sos = np.array(
+                    [[b0, b1, b2, 1.0, a1, a2]], dtype=np.float32
+                )
+            output, zi = sosfilt(
+                self._sos, input, zi=self._zi.reshape(1, 2)
+            )
+            self._zi[:] = zi[0]
+            return output
+
+        if frames > self._out_buf.shape[0]:
+            self._out_buf = np.zeros(frames, dtype=np.float32)
+        output = self._out_buf[:frames]
+        _kernels.biquad_kernel(output, input, b0, b1, b2, a1, a2, self._zi)
+        return output
 
 
 class SynthVCA:
@@ -160,6 +440,18 @@ class SynthVCA:
         """
         self.base_gain = gain
         self._gain_mod = None
+        self._zero_buf = np.zeros(0, dtype=np.float32)
+
+    @property
+    def base_gain(self):
+        return self._base_gain
+
+    @base_gain.setter
+    def base_gain(self, value):
+        self._base_gain = value
+        # Length-1 float32 array so the unmodulated path broadcasts
+        # through the same multiply as the modulated one
+        self._base_gain_arr = np.array([value], dtype=np.float32)
 
     def param(self, name):
         return ParamRef(self, name)
@@ -180,15 +472,23 @@ class SynthVCA:
             np.ndarray: Amplitude-modulated signal.
         """
         if input is None:
-            return np.zeros(frames, dtype=np.float32)
+            if frames > self._zero_buf.shape[0]:
+                self._zero_buf = np.zeros(frames, dtype=np.float32)
+            out = self._zero_buf[:frames]
+            out.fill(0.0)
+            return out
+
+        input = _as_float32c(input)
 
         if self._gain_mod is not None:
             gain = self._gain_mod[:frames]
         else:
-            gain = self.base_gain
-
-        if isinstance(gain, np.ndarray):
-            return input * gain
-        else:
-            return input * float(gain)
+            gain = self._base_gain_arr
+
+        # Scale in place: the input block is chain-owned scratch that
+        # is consumed immediately downstream. Both branches hand a
+        # float32 array to the same broadcast multiply, so there is
+        # no scalar type dispatch per block
+        np.multiply(input, gain, out=input)
+        return input
 
@@ -11,6 +11,10 @@ Author: Valerio Poggi - 2025
 import numpy as np
 import threading
 
+from synth8 import _kernels
+from synth8.nodes import SynthOscillator, SynthVCA
+from synth8.modulators import SynthADSR, SynthLFO
+
 
 class SynthVoice:
     """
@@ -26,6 +30,8 @@ class SynthVoice:
         self.modulators = []
         self.active = False
         self.gate_on = False
+        self._plan = None
+        self._out_buf = np.zeros(0, dtype=np.float32)
 
     def connect(self, module):
         """
@@ -38,6 +44,7 @@ class SynthVoice:
             self.modules.extend(module)
         else:
             self.modules.append(module)
+        self._plan = None
 
     def modulate(self, modulator, target, param=None):
         """
@@ -53,6 +60,7 @@ class SynthVoice:
             modulator.modulate(target.module, target.name)
         else:
             modulator.modulate(target, param)
+        self._plan = None
 
     def add_modulator(self, modulator):
         """
@@ -65,6 +73,7 @@ class SynthVoice:
             self.modulators.extend(modulator)
         else:
             self.modulators.append(modulator)
+        self._plan = None
 
     def trigger_on(self):
         """
@@ -85,9 +94,111 @@ class SynthVoice:
             if hasattr(mod, "trigger_off"):
                 mod.trigger_off()
 
-    def render(self, frames):
+    def _compile_plan(self):
         """
-        Processes modulation and audio for this voice.
+        Inspects the voice graph and returns a fused-render plan when
+        the chain matches the canonical oscillator -> VCA layout with
+        one ADSR on the gain and at most one LFO on the frequency.
+
+        Returns:
+            tuple or bool: (osc, vca, adsr, lfo) plan, or False when
+            the voice must use the generic modular path.
+        """
+        if not _kernels.HAVE_NUMBA:
+            # Without compiled kernels the per-sample fused loop is
+            # interpreted; the vectorized modular path is faster
+            return False
+        if len(self.modules) != 2:
+            return False
+        osc, vca = self.modules
+        if not isinstance(osc, SynthOscillator) or not isinstance(vca, SynthVCA):
+            return False
+        if osc._wave_id is None:
+            return False
+
+        adsr = None
+        lfo = None
+        for mod in self.modulators:
+            if isinstance(mod, SynthADSR) and adsr is None:
+                if mod.targets != [(vca, "gain")]:
+                    return False
+                adsr = mod
+            elif isinstance(mod, SynthLFO) and lfo is None:
+                if mod.targets != [(osc, "freq")]:
+                    return False
+                if mod._wave_id is None:
+                    return False
+                lfo = mod
+            else:
+                return False
+
+        if adsr is None:
+            return False
+
+        return (osc, vca, adsr, lfo)
+
+    def _ensure_plan(self):
+        """
+        Returns the fused-render plan, compiling it on first use.
+
+        Returns:
+            tuple or bool: Plan tuple, or False for the modular path.
+        """
+        if self._plan is None:
+            self._plan = self._compile_plan()
+        return self._plan
+
+    def _gather_fused(self, soa, idx):
+        """
+        Writes this voice's fused-kernel state into slot idx of the
+        engine's structure-of-arrays buffers.
+        """
+        osc, vca, adsr, lfo = self._plan
+        soa['base_freq'][idx] = osc.base_freq
+        soa['units_per_hz'][idx] = osc._units_per_hz
+        soa['osc_phase'][idx] = osc._phase_units
+        soa['wave'][idx] = osc._wave_id
+        if lfo is not None:
+            soa['use_lfo'][idx] = 1
+            soa['lfo_phase'][idx] = lfo._phase_units
+            soa['lfo_inc'][idx] = lfo._units_inc
+            soa['lfo_depth'][idx] = lfo.depth
+            soa['lfo_wave'][idx] = lfo._wave_id
+        else:
+            soa['use_lfo'][idx] = 0
+            soa['lfo_phase'][idx] = 0
+            soa['lfo_inc'][idx] = 0
+            soa['lfo_depth'][idx] = 0.0
+            soa['lfo_wave'][idx] = _kernels.WAVE_SINE
+        soa['env_level'][idx] = adsr.env_level
+        soa['env_phase'][idx] = adsr._phase_id
+        soa['a_rate'][idx] = adsr._a_rate
+        soa['d_rate'][idx] = adsr._d_rate
+        soa['sustain'][idx] = adsr.sustain
+        soa['r_rate'][idx] = adsr._r_rate
+        soa['gain'][idx] = 1.0
+
+    def _scatter_fused(self, soa, idx):
+        """
+        Reads updated state back from slot idx of the engine's
+        structure-of-arrays buffers and refreshes the active flag.
+        """
+        osc, vca, adsr, lfo = self._plan
+        osc._phase_units = int(soa['osc_phase'][idx])
+        if lfo is not None:
+            lfo._phase_units = int(soa['lfo_phase'][idx])
+        env_phase = int(soa['env_phase'][idx])
+        adsr._phase_id = env_phase
+        adsr.env_level = float(soa['env_level'][idx])
+        adsr.active = env_phase != _kernels.ENV_OFF
+        self.active = bool(self.gate_on or adsr.active)
+
+    def _render_fused(self, frames):
+        """
+        Renders one block through the fused Numba kernel.
+
+        The returned array is a reusable scratch buffer owned by the
+        voice; callers must consume it before the next render call.
 
         Parameters:
             frames (int): Number of samples to render.
@@ -95,16 +206,73 @@ class SynthVoice:
         Returns:
             np.ndarray: Output signal block.
         """
-        for mod in self.modulators:
-            mod.render(frames)
+        osc, vca, adsr, lfo = self._plan
+        if frames > self._out_buf.shape[0]:
+            self._out_buf = np.zeros(frames, dtype=np.float32)
+        out = self._out_buf[:frames]
+
+        if lfo is not None:
+            use_lfo = True
+            lfo_phase = lfo._phase_units
+            lfo_inc = lfo._units_inc
+            lfo_depth = lfo.depth
+            lfo_wave = lfo._wave_id
+        else:
+            use_lfo = False
+            lfo_phase = 0
+            lfo_inc = 0
+            lfo_depth = 0.0
+            lfo_wave = _kernels.WAVE_SINE
+
+        osc_phase, lfo_phase, env_phase, env_level = _kernels.voice_kernel(
+            out,
+            osc.base_freq,
+            osc._units_per_hz,
+            osc._phase_units,
+            osc._wave_id,
+            use_lfo, lfo_phase, lfo_inc, lfo_depth, lfo_wave,
+            adsr.env_level,
+            adsr._phase_id,
+            adsr._a_rate, adsr._d_rate, adsr.sustain, adsr._r_rate,
+            1.0, False
+        )
 
-        signal = None
-        for module in self.modules:
-            signal = module.process(signal, frames)
+        osc._phase_units = osc_phase
+        if lfo is not None:
+            lfo._phase_units = lfo_phase
+        adsr._phase_id = env_phase
+        adsr.env_level = env_level
+        adsr.active = env_phase != _kernels.ENV_OFF
 
-        any_mod_active = any(
-            getattr(mod, "active", False) for mod in self.modulators
-        )
+        return out
+
+    def render(self, frames, block_id=None):
+        """
+        Processes modulation and audio for this voice.
+
+        Parameters:
+            frames (int): Number of samples to render.
+            block_id (int, optional): Monotonic audio-block counter,
+                forwarded to modulators so shared ones render once.
+
+        Returns:
+            np.ndarray or None: Output signal block, or None when the
+            voice has no modules and produced no signal.
+        """
+        if self._ensure_plan() is not False:
+            signal = self._render_fused(frames)
+            # The fused kernel already refreshed the envelope state
+            any_mod_active = self._plan[2].active
+        else:
+            any_mod_active = False
+            for mod in self.modulators:
+                mod.render(frames, block_id)
+                if mod.active:
+                    any_mod_active = True
+
+            signal = None
+            for module in self.modules:
+                signal = module.process(signal, frames)
 
         # Deactivate when key is released and all modulators are inactive
         if not self.gate_on and not any_mod_active:
@@ -112,7 +280,9 @@ class SynthVoice:
         else:
             self.active = True
 
-        return signal if signal is not None else np.zeros(frames, dtype=np.float32)
+        # A silent voice returns None so callers can skip the mix add
+        # instead of accumulating a zero block
+        return signal
 
 
 class Mixer:
@@ -129,9 +299,25 @@ class Mixer:
             voices (list of SynthVoice, optional): Voices to mix.
             gain (float): Output gain factor.
         """
-        self.voices = voices if voices else []
         self.gain = gain
         self._lock = threading.Lock()
+        # Fixed slot pool with a free list: retiring a voice nulls
+        # its slot in O(1) instead of rebuilding or scanning a list
+        self._slots = []
+        self._free = []
+        self._mix_buf = np.zeros(0, dtype=np.float32)
+        self._stack = np.zeros((0, 0), dtype=np.float32)
+        if voices:
+            for voice in voices:
+                self.add_voice(voice)
+
+    @property
+    def voices(self):
+        """
+        Returns the voices currently held by the mixer.
+        """
+        with self._lock:
+            return [v for v in self._slots if v is not None]
 
     def add_voice(self, voice):
         """
@@ -141,7 +327,10 @@ class Mixer:
             voice (SynthVoice): Voice to add.
         """
         with self._lock:
-            self.voices.append(voice)
+            if self._free:
+                self._slots[self._free.pop()] = voice
+            else:
+                self._slots.append(voice)
 
     def remove_voice(self, voice):
         """
@@ -151,24 +340,29 @@ class Mixer:
             voice (SynthVoice): Voice to remove.
         """
         with self._lock:
-            if voice in self.voices:
-                self.voices.remove(voice)
+            for i, v in enumerate(self._slots):
+                if v is voice:
+                    self._slots[i] = None
+                    self._free.append(i)
+                    break
 
     def trigger_on(self):
         """
         Triggers all voices in the mixer.
         """
         with self._lock:
-            for voice in self.voices:
-                voice.trigger_on()
+            for voice in self._slots:
+                if voice is not None:
+                    voice.trigger_on()
 
     def trigger_off(self):
         """
         Triggers release phase for all voices.
         """
         with self._lock:
-            for voice in self.voices:
-                voice.trigger_off()
+            for voice in self._slots:
+                if voice is not None:
+                    voice.trigger_off()
 
     @property
     def active(self):
@@ -176,37 +370,57 @@ class Mixer:
         Returns True if at least one voice is active.
         """
         with self._lock:
-            return any(v.active for v in self.voices)
+            return any(v is not None and v.active for v in self._slots)
 
-    def render(self, frames):
+    def render(self, frames, block_id=None):
         """
         Renders audio from all voices, removes inactive ones,
         and mixes the active ones.
 
         Parameters:
             frames (int): Number of samples.
+            block_id (int, optional): Monotonic audio-block counter,
+                forwarded to the voices.
+
+        The returned array is a reusable scratch buffer owned by the
+        mixer; callers must consume it before the next render call.
 
         Returns:
             np.ndarray: Mixed output signal.
         """
-        mix = np.zeros(frames, dtype=np.float32)
+        if frames > self._mix_buf.shape[0]:
+            self._mix_buf = np.zeros(frames, dtype=np.float32)
+        mix = self._mix_buf[:frames]
         active_count = 0
 
         with self._lock:
-            surviving = []
-
-            for voice in self.voices:
-                signal = voice.render(frames)
+            n = len(self._slots)
+            if (self._stack.shape[0] < n
+                    or self._stack.shape[1] < frames):
+                self._stack = np.zeros(
+                    (max(n, 8), max(frames, self._stack.shape[1])),
+                    dtype=np.float32
+                )
+
+            for i, voice in enumerate(self._slots):
+                if voice is None:
+                    continue
+                signal = voice.render(frames, block_id)
                 if voice.active and signal is not None:
-                    mix += signal
+                    np.copyto(self._stack[active_count, :frames], signal)
                     active_count += 1
-                    surviving.append(voice)
-
-            # Replace with only still-active voices
-            self.voices = surviving
+                else:
+                    # Retire the finished voice in place
+                    self._slots[i] = None
+                    self._free.append(i)
 
+        # Single vectorized reduction over the gathered voice blocks
+        # instead of one accumulation pass per voice
         if active_count > 0:
-            mix *= self.gain / active_count
+            np.sum(self._stack[:active_count, :frames], axis=0, out=mix)
+            mix *= np.float32(self.gain / active_count)
+        else:
+            mix.fill(0.0)
 
         return mix
 